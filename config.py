@@ -1,7 +1,7 @@
 import os
 import sys
 import logging
-from datetime import datetime, timezone
+import httpx
 
 
 # ================= Logging Configuration =================
@@ -14,11 +14,13 @@ log_level_str = os.environ.get("LOG_LEVEL", "INFO").upper()
 log_level = getattr(logging, log_level_str, logging.INFO)
 
 
-logging.basicConfig(
-    level=log_level,  # Set logging level.
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',  # Customize how logs appear.
-    stream=sys.stderr  # Logs are sent to standard error.
-)
+# Only configure the root logger once, e.g. when the server is embedded in another application
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=log_level,  # Set logging level.
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',  # Customize how logs appear.
+        stream=sys.stderr  # Logs are sent to standard error.
+    )
 
 # Creates a logger for the MCP server and tools.
 logger = logging.getLogger("xo_mcp_server")
@@ -29,10 +31,13 @@ logger = logging.getLogger("xo_mcp_server")
 # Example: XO API token from Docker secrets or environment variables
 
 # Reads the Xen Orchestra API token from an environment variable.
-XO_API_TOKEN = os.environ.get("XO_API_TOKEN", "")
+XO_API_TOKEN = os.environ.get("XO_API_TOKEN", "").strip()
 
 # Base URL for your Xen Orchestra instance.
-XO_BASE_URL = os.environ.get("XO_BASE_URL", "http://localhost:80")
+XO_BASE_URL = os.environ.get("XO_BASE_URL", "http://localhost:80").strip().rstrip("/")
+
+# Whether the Xen Orchestra connection is configured, checked once instead of on every call
+XO_CONFIG_OK = bool(XO_API_TOKEN) and bool(XO_BASE_URL)
 
 
 # ================= SSL Configuration =================
@@ -48,4 +53,99 @@ if CERT_PATH == '<UNKNOWN>':
     CERT_PATH = None
 
 # Set the certificate verification parameter for the httpx requestes
-httpx_verify = CERT_PATH if CERT_PATH else CERT_VERIFY
\ No newline at end of file
+httpx_verify = CERT_PATH if CERT_PATH else CERT_VERIFY
+
+
+# ================= Request Limits =================
+# Upper bound for the number of items the list tools request from Xen Orchestra.
+# Keeps a single tool call from pulling huge collections into memory at once.
+XO_MAX_LIMIT = int(os.environ.get("XO_MAX_LIMIT", "1000"))
+
+
+# ================= Cache Configuration =================
+# Time in seconds the list tools serve repeated requests from memory, set to 0 to disable the cache
+XO_CACHE_TTL = float(os.environ.get("XO_CACHE_TTL", "30"))
+
+
+# ================= Request Configuration =================
+# Precomputed URL prefix and headers, so the tools don't rebuild them on every call.
+
+# Base URL of the Xen Orchestra REST-API
+XO_REST_URL = f"{XO_BASE_URL}/rest/v0"
+
+# Request headers for the cookie authenticated REST-API
+AUTH_HEADERS_COOKIE = {
+    "Accept": "application/json",
+    "Cookie": f"authenticationToken={XO_API_TOKEN}"
+}
+
+# Request headers for bearer token authenticated requests
+AUTH_HEADERS_BEARER = {
+    "Accept": "application/json",
+    "Authorization": f"Bearer {XO_API_TOKEN}"
+}
+
+
+# ================= HTTP Client Configuration =================
+# Shared httpx client for all MCP tools, reusing connections to Xen Orchestra.
+
+# Maximum number of open connections to Xen Orchestra
+XO_MAX_CONN = int(os.environ.get("XO_MAX_CONN", "100"))
+
+# Maximum number of idle connections kept open for reuse
+XO_MAX_KEEPALIVE = int(os.environ.get("XO_MAX_KEEPALIVE", "40"))
+
+# Use HTTP/2 to multiplex concurrent requests over one connection, set to False to force HTTP/1.1
+XO_HTTP2 = os.environ.get("XO_HTTP2", "True").lower() == "true"
+
+# Maximum number of concurrent requests to Xen Orchestra, further requests wait for a free slot
+XO_MAX_CONCURRENCY = int(os.environ.get("XO_MAX_CONCURRENCY", str(XO_MAX_CONN)))
+
+# Shared AsyncClient, opened by the server lifespan in main.py
+httpx_client = None
+
+# Number of running server lifespans using the shared AsyncClient
+_client_users = 0
+
+
+# Create a new AsyncClient with the Xen Orchestra connection settings
+def create_client():
+    return httpx.AsyncClient(
+        verify=httpx_verify,
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        http2=XO_HTTP2,
+        headers=AUTH_HEADERS_COOKIE,
+        limits=httpx.Limits(max_connections=XO_MAX_CONN, max_keepalive_connections=XO_MAX_KEEPALIVE, keepalive_expiry=30.0)
+    )
+
+
+# Return the shared AsyncClient, fall back to creating it on first use
+# when the tools are called outside of the server lifespan
+def get_client():
+    global httpx_client
+
+    if httpx_client is None:
+        httpx_client = create_client()
+
+    return httpx_client
+
+
+# Take a reference to the shared AsyncClient for a server lifespan, create it if there is none.
+# SSE and streamable HTTP run one lifespan per session, so several can overlap.
+def open_client():
+    global _client_users
+
+    _client_users += 1
+    return get_client()
+
+
+# Drop a lifespan's reference, close the shared AsyncClient once the last lifespan ended
+async def close_client():
+    global httpx_client, _client_users
+
+    _client_users -= 1
+    if _client_users > 0 or httpx_client is None:
+        return
+
+    client, httpx_client = httpx_client, None
+    await client.aclose()
@@ -1,45 +1,69 @@
 #!/usr/bin/env python3
-import logging
 import sys
+from contextlib import asynccontextmanager
 from mcp.server.fastmcp import FastMCP
-from tools import vm, backup_jobs, backup_logs, backup_repo, docs
-from config import XO_BASE_URL, XO_API_TOKEN, logger
+import config
+from tools import vm, backup_jobs, backup_logs, backup_repo, docs, dashboard
+from config import XO_CONFIG_OK, logger
+
+
+# ================= Server Lifespan =================
+# Opens the shared httpx client on the server's event loop and closes it when the last session ends.
+# Pooled connections are bound to the loop that opened them, so the client must not outlive it.
+@asynccontextmanager
+async def lifespan(server):
+    config.open_client()
+
+    try:
+        yield
+    finally:
+        await config.close_client()
 
 
 # ================= Initialize MCP Server =================
 # Initializes the MCP server instance.
 # The string is the server's name, which shows up in the client.
-mcp = FastMCP("xo_mcp_server")
+mcp = FastMCP("xo_mcp_server", lifespan=lifespan)
 
 
 # ================= Register MCP Tools =================
 # Register the MCP tools from the submodule.
-# Each tool must be registered seperatly
+# Each tool must be registered seperatly, mcp.tool() adds it to the server's tool list
 
 # Register Doc related functions as MCP tools.
-mcp.get_docs = mcp.tool()(docs.get_docs)
+mcp.tool()(docs.get_docs)
 
 # Register VM related functions as MCP tools.
-mcp.list_vms = mcp.tool()(vm.list_vms)
-#mcp.create_vm = mcp.tool()(vm.create_vm)
+mcp.tool()(vm.list_vms)
+#mcp.tool()(vm.create_vm)
 
 #Register Backup related functions as MCP tools.
-mcp.list_backup_jobs = mcp.tool()(backup_jobs.list_backup_jobs)
-mcp.get_backup_job_details = mcp.tool()(backup_jobs.get_backup_job_details)
+mcp.tool()(backup_jobs.list_backup_jobs)
+mcp.tool()(backup_jobs.get_backup_job_details)
 
-mcp.list_backup_logs = mcp.tool()(backup_logs.list_backup_logs)
-mcp.get_backup_log_details = mcp.tool()(backup_logs.get_backup_log_details)
+mcp.tool()(backup_logs.list_backup_logs)
+mcp.tool()(backup_logs.get_backup_log_details)
 
-mcp.list_backup_repositories = mcp.tool()(backup_repo.list_backup_repositories)
-mcp.get_backup_repository_details = mcp.tool()(backup_repo.get_backup_repository_details)
+mcp.tool()(backup_repo.list_backup_repositories)
+mcp.tool()(backup_repo.get_backup_repository_details)
+
+# Register Dashboard related functions as MCP tools.
+mcp.tool()(dashboard.list_dashboard)
 
 # ================= Server Startup =================
 if __name__ == "__main__":
 
     logger.info("Starting Xen Orchestra MCP server...")
 
-    if not XO_API_TOKEN.strip():
-        logger.warning(f"XO_API_TOKEN not set. Some tools may fail. Token: {XO_API_TOKEN}")
+    if not XO_CONFIG_OK:
+        logger.warning("XO_API_TOKEN or XO_BASE_URL not set. Some tools may fail.")
+
+    # Run the server on uvloop if it's installed, it handles the tools' network I/O faster than the default loop.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.debug("uvloop not installed, using the default asyncio event loop")
 
     try:
 
@@ -48,7 +72,7 @@ if __name__ == "__main__":
         mcp.run(transport='stdio')
 
     except Exception as e:
-        logger.error(f"Server error: {e}", exc_info=True)
+        logger.error("Server error: %s", e, exc_info=True)
 
         # Exits the program if server fails.
         sys.exit(1)
\ No newline at end of file
@@ -1,21 +1,28 @@
-import urllib.parse
-import httpx
 from typing import Annotated
 from pydantic import Field
-from config import XO_BASE_URL, XO_API_TOKEN, httpx_verify, logger
+from tools.helpers import xo_tool, DEFAULT_LIMIT, fetch_list, json_loads, xo_admission
+from config import XO_REST_URL, get_client, logger
 
 # ================= Backup MCP Tools =================
 # Each MCP tool is a function decorated with @mcp.tool()
 # It must return a string and have single-line docstrings.
 
+# REST-API URL of the backup logs, built once at import
+_BACKUP_LOGS_URL = f"{XO_REST_URL}/backup-logs"
+
+# Default fields if the client didn't provide any
+_DEFAULT_FIELDS = ("jobName", "jobId", "status", "data")
+
 
 
 # ================= List Backup Logs =================
 # List all backup logs with their {fields} depending on {filters}
+@xo_tool
 async def list_backup_logs(
     fields: Annotated[list[str], Field(description="The fields for the backup logs to include in the API response")] = None,
     filter: Annotated[dict[str, str], Field(description="Key-value filters to filter for backup logs")] = None,
-    limit: Annotated[int, Field(description="Max number of results (default: 42)")] = 42
+    limit: Annotated[int, Field(description=f"Max number of results (default: {DEFAULT_LIMIT})")] = DEFAULT_LIMIT,
+    exclude: Annotated[list[str], Field(description="The fields to remove from the backup logs in the response")] = None
 ):
 
     # Tool description
@@ -37,82 +44,39 @@ async def list_backup_logs(
         - "jobId":     Filter for the backup job id [id for the backup job]
         - "data:mode": Filter for the mode of the backup job [full, delta]
     limit: Maximum number of results to return. Set to 999 to return all VMs.
+    exclude: Fields to remove from every item before returning the response.
     """
 
-    # Logging output
-    logger.info("Fetching backup logs from Xen Orchestra")
-
-    try:
-        # Set the Request headers
-        headers = {
-            "Accept": "application/json",
-            "Cookie": f"authenticationToken={XO_API_TOKEN}"
-        }
-
-        # Set defaults if client didn't provide any
-        if not fields:
-            fields = ["jobName", "jobId", "status", "data"]
-
-        # Prepare URL Parameters
-        fields_param = urllib.parse.quote(",".join(fields))
-        filter_param = urllib.parse.quote(" ".join(f"{k}:{v}" for k, v in filter.items()))
-
-        # Build URL with Parameters
-        url = f"{XO_BASE_URL}/rest/v0/backup-logs?fields={fields_param}&filter={filter_param}&limit={limit}"
-
-        # Output the URL for debugging
-        logger.debug(f"Request URL: {url}")
-
-        # Call the Xen Orchestra REST-API
-        async with httpx.AsyncClient(verify=httpx_verify, timeout=10) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-
-            #Remove the href to not confuse the client
-            for item in data:
-                item.pop("href", None)
-
-            # Return MCP friendly list of information
-            return {
-                    "status": "success" if data else "failure",
-                    "total": len(data),
-                    "backup-logs": data
-            }
-
-    
-    # Error handling for http request failures
-    except httpx.HTTPStatusError as e:
-
-        # Log an error code if the http request fails
-        logger.error(f"HTTP Error: {e.response.status_code} - {e.response.text}")
-
-        # Return an error code to the client if the http request fails
+    # Validate the arguments before calling the API
+    if limit < 1:
         return {
                 "status": "failure",
-                "type": "http-error",
-                "status-code":  e.response.status_code,
-                "error-text": e.response.text
+                "type": "invalid-argument",
+                "error-text": "limit must be a positive number"
         }
-    
-    
-    # Error handling for exceptions
-    except Exception as e:
 
-        # Log an error code if an exception was raised
-        logger.error(f"Exception encountered while fetching the Xen Orchestra URL: {e}")
+    # Logging output
+    logger.info("Fetching backup logs from Xen Orchestra")
 
-        # Return an error code to the client if an exception was raised
-        return {
-                "status": "failure",
-                "type": "exception",
-                "error-text": str(e)
-        }
+    # Call the Xen Orchestra REST-API, repeated requests are served from the cache
+    data = await fetch_list(_BACKUP_LOGS_URL, fields or _DEFAULT_FIELDS, filter, limit)
+
+    #Remove the href and excluded fields to not confuse the client
+    drop = {"href", *(exclude or [])}
+    data = [{key: value for key, value in item.items() if key not in drop} for item in data]
+
+    # Return MCP friendly list of information
+    return {
+            "status": "success" if data else "failure",
+            "total": len(data),
+            "backup-logs": data
+    }
 
 
 
 # ================= Get Backup Log Details =================
 # List details for a backup log
+@xo_tool
 async def get_backup_log_details(
     id: Annotated[str, Field(description="The id of the backup log to list details for, use list_backup_logs to get the id")] = None
 ):
@@ -126,59 +90,33 @@ async def get_backup_log_details(
     id: Mandatory, use the list_backup_logs tool before to retrieve the id of the backup log.
     """
 
-    # Logging output
-    logger.info("Fetching backup job details from Xen Orchestra")
-
-    try:
-        # Set the Request headers
-        headers = {
-            "Accept": "application/json",
-            "Cookie": f"authenticationToken={XO_API_TOKEN}"
+    # Validate the arguments before calling the API, also accept the href of the item
+    id = id.strip().removeprefix("/rest/v0/backup-logs/") if id else ""
+    if not id:
+        return {
+                "status": "failure",
+                "type": "invalid-argument",
+                "error-text": "id is required, use the list_backup_logs tool to get the id"
         }
 
-        # Build URL with Parameters
-        url = f"{XO_BASE_URL}/rest/v0/backup-logs/{id}"
-
-        # Output the URL for debugging
-        logger.debug(f"Request URL: {url}")
-
-        # Call the Xen Orchestra REST-API
-        async with httpx.AsyncClient(verify=httpx_verify, timeout=10) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+    # Logging output
+    logger.info("Fetching backup job details from Xen Orchestra")
 
-            # Return MCP friendly list of information
-            return {
-                    "status": "success" if data else "failure",
-                    "backup-log-details": data
-            }
+    # Build URL with Parameters
+    url = f"{_BACKUP_LOGS_URL}/{id}"
 
-    
-    # Error handling for http request failures
-    except httpx.HTTPStatusError as e:
+    # Output the URL for debugging
+    logger.debug("Request URL: %s", url)
 
-        # Log an error code if the http request fails
-        logger.error(f"HTTP Error: {e.response.status_code} - {e.response.text}")
+    # Call the Xen Orchestra REST-API
+    client = get_client()
+    async with xo_admission:
+        response = await client.get(url)
+    response.raise_for_status()
+    data = json_loads(response.content)
 
-        # Return an error code to the client if the http request fails
-        return {
-                "status": "failure",
-                "type": "http-error",
-                "status-code":  e.response.status_code,
-                "error-text": e.response.text
-        }
-    
-    
-    # Error handling for exceptions
-    except Exception as e:
-
-        # Log an error code if an exception was raised
-        logger.error(f"Exception encountered while fetching the Xen Orchestra URL: {e}")
-
-        # Return an error code to the client if an exception was raised
-        return {
-                "status": "failure",
-                "type": "exception",
-                "error-text": str(e)
-        }
\ No newline at end of file
+    # Return MCP friendly list of information
+    return {
+            "status": "success" if data else "failure",
+            "backup-log-details": data
+    }
@@ -0,0 +1,35 @@
+import asyncio
+from tools.helpers import xo_tool
+from tools.vm import list_vms
+from tools.backup_jobs import list_backup_jobs
+from config import logger
+
+# ================= Dashboard MCP Tools =================
+# Each MCP tool is a function decorated with @mcp.tool()
+# It must return a string and have single-line docstrings.
+
+
+
+# ================= List Dashboard =================
+# List the VMs and backup jobs together, fetched concurrently
+@xo_tool
+async def list_dashboard():
+
+    # Tool description
+    """
+    Get an overview of Xen Orchestra with the VMs and the backup jobs in a single call.
+    Use list_vms and list_backup_jobs instead to customize the fields and filters.
+    """
+
+    # Logging output
+    logger.info("Fetching dashboard from Xen Orchestra")
+
+    # Call the list tools for both collections at the same time, they share the response cache
+    vms, backup_jobs = await asyncio.gather(list_vms(), list_backup_jobs())
+
+    # Return MCP friendly list of information, each collection keeps its error if it failed
+    return {
+            "status": "success" if "success" in (vms["status"], backup_jobs["status"]) else "failure",
+            "vms": {key: value for key, value in vms.items() if key != "status"},
+            "backup-jobs": {key: value for key, value in backup_jobs.items() if key != "status"}
+    }
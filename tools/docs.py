@@ -1,85 +1,103 @@
-import urllib.parse
-import httpx
+import asyncio
+import time
 from typing import Annotated
 from pydantic import Field
-from config import XO_BASE_URL, XO_API_TOKEN, httpx_verify, logger
+from tools.helpers import xo_tool, json_loads, xo_admission
+from config import XO_REST_URL, get_client, logger
 
 # ================= DOCS MCP Tools =================
 # Each MCP tool is a function decorated with @mcp.tool()
 # It must return a string and have single-line docstrings.
 
+# REST-API URL of the swagger docs, built once at import
+_DOCS_URL = f"{XO_REST_URL}/docs/swagger.json"
+
+
+
+# ================= Swagger Docs Cache =================
+# The swagger docs don't change while the server is running, keep them in memory for an hour.
+
+# Time in seconds until the cached swagger docs are fetched again
+_DOCS_TTL = 3600
+
+# Cached swagger docs as (fetch timestamp, parsed docs)
+_docs_cache = None
+
+# Lock to fetch the swagger docs only once when several calls miss the cache at the same time
+_docs_lock = asyncio.Lock()
+
+
+# Return the cached swagger docs, fetch them from Xen Orchestra if the cache is empty or expired
+async def _fetch_docs():
+    global _docs_cache
+
+    # Serve the cached docs without waiting for the lock
+    if _docs_cache is not None and time.monotonic() - _docs_cache[0] < _DOCS_TTL:
+        return _docs_cache[1]
+
+    async with _docs_lock:
+
+        # Another call may have refreshed the cache while waiting for the lock
+        if _docs_cache is not None and time.monotonic() - _docs_cache[0] < _DOCS_TTL:
+            return _docs_cache[1]
+
+        # Build URL with Parameters
+        url = _DOCS_URL
+
+        # Output the URL for debugging
+        logger.debug("Request URL: %s", url)
+
+        # Call the Xen Orchestra REST-API
+        client = get_client()
+        async with xo_admission:
+            response = await client.get(url)
+        response.raise_for_status()
+        data = json_loads(response.content)
+
+        _docs_cache = (time.monotonic(), data)
+        return data
+
 
 
 # ================= Get Swagger Docs =================
 # Get the swagger docs for the Xen Orchestra API
+@xo_tool
 async def get_docs(
+    fields: Annotated[list[str], Field(description="The top-level sections of the swagger docs to include in the response")] = None,
+    paths: Annotated[list[str], Field(description="Only include API paths starting with one of these prefixes")] = None
 ):
 
     # Tool description
     """
     Get the swagger documentation for the Xen Orchestra API.
     Use this tool to fetch information on how to use fields and filters for the other MCP Tool calls.
+    The full documentation is large, narrow it down with fields and paths whenever possible.
 
+    fields:
+        - "paths":      The API endpoints with their parameters
+        - "components": The schemas of the API objects
+        - "info":       General information about the API
+    paths: Only include endpoints starting with these prefixes, e.g. ["/vms", "/backup-jobs"].
     """
 
     # Logging output
     logger.info("Fetching swagger docs from Xen Orchestra")
 
-    try:
-        # Set the Request headers
-        headers = {
-            "Accept": "application/json",
-            "Cookie": f"authenticationToken={XO_API_TOKEN}"
-        }
+    # Get the swagger docs from the cache or the Xen Orchestra REST-API
+    data = await _fetch_docs()
 
-        # Build URL with Parameters
-        url = f"{XO_BASE_URL}/rest/v0/docs/swagger.json"
+    # Only keep the requested sections of the swagger docs
+    if fields:
+        data = {key: value for key, value in data.items() if key in fields}
 
-        # Output the URL for debugging
-        logger.debug(f"Request URL: {url}")
+    # Only keep the requested API paths
+    if paths and "paths" in data:
+        prefixes = tuple(paths)
+        data = {**data, "paths": {path: spec for path, spec in data["paths"].items() if path.startswith(prefixes)}}
 
-        # Call the Xen Orchestra REST-API
-        async with httpx.AsyncClient(verify=httpx_verify, timeout=10) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-
-            #Remove the href to not confuse the client
-            for item in data:
-                item.pop("href", None)
-
-            # Return MCP friendly list of information
-            return {
-                    "status": "success" if data else "failure",
-                    "total": len(data),
-                    "swagger-docs": data
-            }
-
-    
-    # Error handling for http request failures
-    except httpx.HTTPStatusError as e:
-
-        # Log an error code if the http request fails
-        logger.error(f"HTTP Error: {e.response.status_code} - {e.response.text}")
-
-        # Return an error code to the client if the http request fails
-        return {
-                "status": "failure",
-                "type": "http-error",
-                "status-code":  e.response.status_code,
-                "error-text": e.response.text
-        }
-    
-    
-    # Error handling for exceptions
-    except Exception as e:
-
-        # Log an error code if an exception was raised
-        logger.error(f"Exception encountered while calling the Xen Orchestra URL: {e}")
-
-        # Return an error code to the client if an exception was raised
-        return {
-                "status": "failure",
-                "type": "exception",
-                "error-text": str(e)
-        }
\ No newline at end of file
+    # Return MCP friendly list of information
+    return {
+            "status": "success" if data else "failure",
+            "total": len(data),
+            "swagger-docs": data
+    }
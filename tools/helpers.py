@@ -0,0 +1,190 @@
+import time
+import asyncio
+import functools
+import httpx
+from functools import lru_cache
+from config import XO_CACHE_TTL, XO_MAX_LIMIT, XO_MAX_CONCURRENCY, get_client, logger
+
+# ================= Tool Helpers =================
+# Shared helper functions for the MCP tools.
+
+
+
+# ================= Admission Control =================
+# Limits the number of concurrent requests to Xen Orchestra.
+# Unlike an asyncio.Semaphore the limit can safely be changed at runtime with set_limit().
+class AdmissionController:
+
+    def __init__(self, limit):
+        self.cur = 0
+        self.cmax = limit
+        self.cond = asyncio.Condition()
+
+    # Wait until a request slot is free and take it
+    async def acquire(self):
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.cur < self.cmax)
+            self.cur += 1
+
+    # Give the request slot back and wake up the waiting requests
+    async def release(self):
+
+        # Free the slot before awaiting anything, so a cancelled task can't leak it
+        self.cur -= 1
+
+        # Shield the wakeup, so a cancellation while waiting for the lock can't lose it
+        await asyncio.shield(self._notify_all())
+
+    # Change the limit, waiting requests are woken up to check the new limit
+    async def set_limit(self, limit):
+        self.cmax = limit
+        await asyncio.shield(self._notify_all())
+
+    # Wake up all waiting requests, each re-checks for a free slot.
+    # Waking only one could lose the wakeup if that request is cancelled before it runs.
+    async def _notify_all(self):
+        async with self.cond:
+            self.cond.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+
+# Admission controller admitting at most XO_MAX_CONCURRENCY requests at a time
+xo_admission = AdmissionController(XO_MAX_CONCURRENCY)
+
+
+
+# ================= Error Handling =================
+# Wraps an MCP tool and turns raised errors into MCP friendly failure responses,
+# so the tools themselves only implement the successful path.
+def xo_tool(fn):
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await fn(*args, **kwargs)
+
+        # Error handling for http request failures
+        except httpx.HTTPStatusError as e:
+
+            # Log an error code if the http request fails
+            logger.error("HTTP Error in %s: %s - %s", fn.__name__, e.response.status_code, e.response.text)
+
+            # Return an error code to the client if the http request fails
+            return {
+                    "status": "failure",
+                    "type": "http-error",
+                    "status-code":  e.response.status_code,
+                    "error-text": e.response.text
+            }
+
+        # Error handling for exceptions
+        except Exception as e:
+
+            # Log an error code if an exception was raised
+            logger.error("Exception encountered in %s while calling the Xen Orchestra URL: %s", fn.__name__, e, exc_info=True)
+
+            # Return an error code to the client if an exception was raised
+            return {
+                    "status": "failure",
+                    "type": "exception",
+                    "error-text": str(e)
+            }
+
+    return wrapper
+
+
+
+# ================= JSON Handling =================
+# Use orjson to parse and serialize JSON when it's installed, fall back to the standard library otherwise
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+
+except ImportError:
+    import json
+
+    json_loads = json.loads
+
+    # Serialize to compact bytes like orjson.dumps
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+
+# ================= Query Parameters =================
+# Default number of results for the list tools
+DEFAULT_LIMIT = 42
+
+
+# Build the query parameters for a list request, cached per fields, filter and limit combination
+# so repeated tool calls reuse the already encoded parameters
+@lru_cache(maxsize=128)
+def build_list_params(fields: tuple[str, ...], filter_items: tuple[tuple[str, str], ...], limit: int) -> httpx.QueryParams:
+    params = {"fields": ",".join(fields), "limit": limit}
+    if filter_items:
+        params["filter"] = " ".join(f"{k}:{v}" for k, v in filter_items)
+
+    return httpx.QueryParams(params)
+
+
+
+# ================= Response Cache =================
+# Short-lived cache for the read-only list requests, MCP clients tend to repeat the same calls.
+
+# Maximum number of cached responses, the oldest entry is dropped when full
+_RESPONSE_CACHE_SIZE = 128
+
+# Cached responses as {(url, params): (fetch timestamp, parsed data)}
+_response_cache = {}
+
+
+# Fetch a list from the REST-API, serve it from the cache if it was fetched less than XO_CACHE_TTL seconds ago
+async def cached_get(url: str, params: httpx.QueryParams):
+    key = (url, str(params))
+
+    cached = _response_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < XO_CACHE_TTL:
+        return cached[1]
+
+    client = get_client()
+    async with xo_admission:
+        response = await client.get(url, params=params)
+    response.raise_for_status()
+    data = json_loads(response.content)
+
+    if XO_CACHE_TTL > 0:
+        _response_cache.pop(key, None)
+        if len(_response_cache) >= _RESPONSE_CACHE_SIZE:
+            _response_cache.pop(next(iter(_response_cache)))
+        _response_cache[key] = (time.monotonic(), data)
+
+    return data
+
+
+# Drop all cached responses, called after a tool changed something in Xen Orchestra
+def clear_response_cache():
+    _response_cache.clear()
+
+
+
+# ================= Fetch Lists =================
+# Fetch a list from the REST-API with the {fields} depending on {filter}, shared by all list tools
+async def fetch_list(url: str, fields, filter=None, limit=DEFAULT_LIMIT):
+
+    # Prepare URL Parameters, cached for repeated fields, filter and limit combinations
+    filter_items = tuple(sorted(filter.items())) if filter else ()
+    params = build_list_params(tuple(fields), filter_items, min(limit, XO_MAX_LIMIT))
+
+    # Output the URL for debugging
+    logger.debug("Request URL: %s - Parameters: %s", url, params)
+
+    # Call the Xen Orchestra REST-API, repeated requests are served from the cache
+    return await cached_get(url, params)
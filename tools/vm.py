@@ -1,20 +1,27 @@
-import urllib.parse
-import httpx
 from typing import Annotated
 from pydantic import Field
-from config import XO_BASE_URL, XO_API_TOKEN, httpx_verify, logger
+from tools.helpers import xo_tool, DEFAULT_LIMIT, fetch_list, clear_response_cache, json_loads, json_dumps, xo_admission
+from config import XO_BASE_URL, XO_REST_URL, AUTH_HEADERS_BEARER, get_client, logger
 
 # ================= VM MCP Tools =================
 # Each MCP tool is a function decorated with @mcp.tool()
 # It must return a string and have single-line docstrings.
 
+# REST-API URL of the VMs, built once at import
+_VMS_URL = f"{XO_REST_URL}/vms"
+
+# Default fields if the client didn't provide any
+_DEFAULT_FIELDS = ("name_label", "name_description", "power_state", "uuid")
+
 
 # ================= List VMs =================
 # List all VMs with their {fields} depending on {filters}
+@xo_tool
 async def list_vms(
     fields: Annotated[list[str], Field(description="The fields for the VMs to include in the API response")] = None,
     filter: Annotated[dict[str, str], Field(description="Key-value filters to filter for VMs")] = None,
-    limit: Annotated[int, Field(description="Max number of results (default: 42)")] = 42
+    limit: Annotated[int, Field(description=f"Max number of results (default: {DEFAULT_LIMIT})")] = DEFAULT_LIMIT,
+    exclude: Annotated[list[str], Field(description="The fields to remove from the VMs in the response")] = None
 ):
 
     # Tool description
@@ -33,93 +40,66 @@ async def list_vms(
         - "container":   The name of the Hypervisor where the VM is running on.
         - "tags":        The tags assigned to the VM
     limit: Maximum number of results to return. Set to 999 to return all VMs.
+    exclude: Fields to remove from every item before returning the response.
     """
 
-    # Logging output
-    logger.info("Fetching VMs from Xen Orchestra")
-
-    try:
-        # Set the Request headers
-        headers = {
-            "Accept": "application/json",
-            "Cookie": f"authenticationToken={XO_API_TOKEN}"
+    # Validate the arguments before calling the API
+    if limit < 1:
+        return {
+                "status": "failure",
+                "type": "invalid-argument",
+                "error-text": "limit must be a positive number"
         }
 
-        # Set defaults if client didn't provide any
-        if not fields:
-            fields = ["name_label", "name_description", "power_state", "uuid"]
-
-        # Prepare URL Parameters
-        fields_param = urllib.parse.quote(",".join(fields))
-        filter_param = urllib.parse.quote(" ".join(f"{k}:{v}" for k, v in filter.items()))
-
-        # Build URL with Parameters
-        url = f"{XO_BASE_URL}/rest/v0/vms?fields={fields_param}&filter={filter_param}&limit={limit}"
-
-        # Output the URL for debugging
-        logger.debug(f"Request URL: {url}")
+    # Logging output
+    logger.info("Fetching VMs from Xen Orchestra")
 
-        # Call the Xen Orchestra REST-API
-        async with httpx.AsyncClient(verify=httpx_verify, timeout=10) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+    # Call the Xen Orchestra REST-API
+    data = await fetch_list(_VMS_URL, fields or _DEFAULT_FIELDS, filter, limit)
 
-            # Return MCP friendly list of information
-            return {
-                    "status": "success" if data else "failure",
-                    "total": len(data),
-                    "vms": data
-            }
+    # Remove the excluded fields to not confuse the client
+    if exclude:
+        drop = set(exclude)
+        data = [{key: value for key, value in item.items() if key not in drop} for item in data]
 
-    
-    # Error handling for http request failures
-    except httpx.HTTPStatusError as e:
+    # Return MCP friendly list of information
+    return {
+            "status": "success" if data else "failure",
+            "total": len(data),
+            "vms": data
+    }
 
-        # Log an error code if the http request fails
-        logger.error(f"HTTP Error: {e.response.status_code} - {e.response.text}")
 
-        # Return an error code to the client if the http request fails
-        return {
-                "status": "failure",
-                "type": "http-error",
-                "status-code":  e.response.status_code,
-                "error-text": e.response.text
-        }
-    
-    
-    # Error handling for exceptions
-    except Exception as e:
 
-        # Log an error code if an exception was raised
-        logger.error(f"Exception encountered while fetching the Xen Orchestra URL: {e}")
+# ================= VM API Constants =================
+# Endpoint and headers of the VM API, built once at import
 
-        # Return an error code to the client if an exception was raised
-        return {
-                "status": "failure",
-                "type": "exception",
-                "error-text": str(e)
-        }
+# Base URL of the VM API
+_VM_API_URL = f"{XO_BASE_URL}/api/v1/vms"
 
+# Request headers for sending a JSON payload to the VM API
+_JSON_HEADERS_BEARER = {**AUTH_HEADERS_BEARER, "Content-Type": "application/json"}
 
 
 # ================= Create VM =================
 # Create a VM from a template
 async def create_vm(name: str = "", template_id: str = ""):
     """Create a new VM from a template."""
-    if not name.strip() or not template_id.strip():
+    name, template_id = name.strip(), template_id.strip()
+    if not name or not template_id:
         return "❌ Error: Both 'name' and 'template_id' are required"
-    logger.info(f"Creating VM: {name} from template {template_id}")
+    logger.info("Creating VM: %s from template %s", name, template_id)
+    payload = json_dumps({"name_label": name, "template": template_id})
     try:
-        payload = {"name_label": name, "template": template_id}
-        headers = {"Authorization": f"Bearer {XO_API_TOKEN}"}
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.post(f"{XO_BASE_URL}/api/v1/vms", headers=headers, json=payload)
-            response.raise_for_status()
-            vm = response.json()
-            return f"✅ VM created: {vm.get('name_label')} ({vm.get('id')})"
+        client = get_client()
+        async with xo_admission:
+            response = await client.post(_VM_API_URL, headers=_JSON_HEADERS_BEARER, content=payload)
+        response.raise_for_status()
+        vm = json_loads(response.content)
+        clear_response_cache()
+        return f"✅ VM created: {vm.get('name_label')} ({vm.get('id')})"
     except Exception as e:
-        logger.error(f"Error creating VM: {e}")
+        logger.error("Error creating VM: %s", e)
         return f"❌ Error: {str(e)}"
 # Modify payload to include CPU, RAM, or disk parameters as needed.
 
@@ -127,17 +107,21 @@ async def create_vm(name: str = "", template_id: str = ""):
 # ================= Delete VM =================
 # Delete a VM based on the id
 async def delete_vm(vm_id: str = ""):
-    """Delete a VM by its ID."""
-    if not vm_id.strip():
+    """Delete a VM by its ID or href."""
+    vm_id = vm_id.strip().removeprefix("/rest/v0/vms/")
+    if not vm_id:
         return "❌ Error: 'vm_id' is required"
-    logger.info(f"Deleting VM: {vm_id}")
+    logger.info("Deleting VM: %s", vm_id)
     try:
-        headers = {"Authorization": f"Bearer {XO_API_TOKEN}"}
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.delete(f"{XO_BASE_URL}/api/v1/vms/{vm_id}", headers=headers)
-            response.raise_for_status()
+        client = get_client()
+        async with xo_admission:
+            response = await client.delete(f"{_VM_API_URL}/{vm_id}", headers=AUTH_HEADERS_BEARER)
+        if 200 <= response.status_code < 300:
+            clear_response_cache()
             return f"✅ VM {vm_id} deleted successfully"
+        logger.error("Error deleting VM %s: %s - %s", vm_id, response.status_code, response.text[:500])
+        return f"❌ API Error: {response.status_code} - {response.text[:1000]}"
     except Exception as e:
-        logger.error(f"Error deleting VM: {e}")
+        logger.error("Error deleting VM: %s", e)
         return f"❌ Error: {str(e)}"
 # You could add a confirmation flag before deletion for safety.
\ No newline at end of file